@@ -22,7 +22,10 @@ Examples:
   
   # File I/O with YAML output
   jaql run pipeline.yaml --input data.json --output result.yaml --emit yaml
-  
+
+  # NDJSON output for line-oriented downstream consumers
+  cat data.ndjson | jaql run pipeline.yaml --emit ndjson | jq .
+
   # Pipeline validation
   jaql validate pipeline.yaml
         """.strip()
@@ -32,7 +35,7 @@ Examples:
     parser.add_argument("pipeline", help="YAML/JSON pipeline file")
     parser.add_argument("--input", "-i", help="Input file (default: stdin)")
     parser.add_argument("--output", "-o", help="Output file (default: stdout)")
-    parser.add_argument("--emit", choices=["json", "yaml"], default="json", 
+    parser.add_argument("--emit", choices=["json", "yaml", "ndjson"], default="json",
                        help="Output format (default: json)")
     
     args = parser.parse_args()
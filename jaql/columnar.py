@@ -0,0 +1,297 @@
+"""
+JAQL columnar execution: vectorized pipelines over homogeneous record batches
+Optional NumPy acceleration for numeric-heavy select/derive (SoA layout)
+"""
+
+import ast
+import operator
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+from .utils import compile_expr
+from . import utils
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+try:
+    import numba
+    HAS_NUMBA = True
+except ImportError:
+    numba = None
+    HAS_NUMBA = False
+
+# Minimum batch size before columnar conversion pays for itself
+COLUMNAR_THRESHOLD = 1024
+
+# Minimum batch size before mask-based select beats the per-record loop
+BATCH_SELECT_THRESHOLD = 256
+
+_CMP_OPS = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+}
+
+# AST nodes allowed in a vectorizable expression: plain arithmetic and
+# comparisons over column names and literals (no calls, no subscripts,
+# no and/or — those don't broadcast over arrays)
+_VECTOR_NODES = (
+    ast.Expression, ast.Compare, ast.BinOp, ast.UnaryOp,
+    ast.Name, ast.Constant, ast.Load,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+    ast.USub, ast.UAdd,
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+)
+
+def _vector_expr_names(expr: str) -> Optional[List[str]]:
+    """
+    Return the column names a vectorizable expression reads, or None
+
+    None means the expression uses constructs that don't broadcast over
+    arrays and must take the per-record path.
+    """
+    try:
+        tree = ast.parse(expr, mode='eval')
+    except Exception:
+        return None
+    names = []
+    for node in ast.walk(tree):
+        if not isinstance(node, _VECTOR_NODES):
+            return None
+        if isinstance(node, ast.Name):
+            names.append(node.id)
+    return names
+
+@lru_cache(maxsize=256)
+def _numba_kernel(expr: str, names: tuple):
+    """
+    Compile a numeric expression into an njit kernel over column arrays
+
+    Returns None when Numba is unavailable or compilation fails; callers
+    fall back to the NumPy eval path. cache=True persists the compiled
+    machine code across process invocations.
+    """
+    if not HAS_NUMBA:
+        return None
+    source = f"def _kernel({', '.join(names)}):\n    return {expr}"
+    namespace = {}
+    try:
+        exec(compile(source, '<jaql-kernel>', 'exec'), {}, namespace)
+        return numba.njit(cache=True)(namespace['_kernel'])
+    except Exception:
+        return None
+
+def _simple_predicate_terms(expression: str):
+    """
+    Pattern-match '<name> <cmp> <literal>' predicates (optionally joined
+    by a single and/or), returning (is_conjunction, [(name, op, value)])
+
+    Returns None for anything more complex; those expressions stay on the
+    per-record eval path.
+    """
+    try:
+        body = ast.parse(expression, mode='eval').body
+    except Exception:
+        return None
+
+    if isinstance(body, ast.BoolOp):
+        is_conjunction = isinstance(body.op, ast.And)
+        comparisons = body.values
+    else:
+        is_conjunction = True
+        comparisons = [body]
+
+    terms = []
+    for node in comparisons:
+        if not (isinstance(node, ast.Compare)
+                and isinstance(node.left, ast.Name)
+                and len(node.ops) == 1
+                and type(node.ops[0]) in _CMP_OPS
+                and isinstance(node.comparators[0], ast.Constant)
+                and isinstance(node.comparators[0].value, (int, float, str, bool))):
+            return None
+        terms.append((node.left.id,
+                      _CMP_OPS[type(node.ops[0])],
+                      node.comparators[0].value))
+    return is_conjunction, terms
+
+def make_batch_select(expression: str, record_op: Callable) -> Optional[Callable]:
+    """
+    Build a whole-batch filter for a simple comparison predicate
+
+    Large batches evaluate the predicate as a NumPy boolean mask in one C
+    loop per term and fancy-index the surviving records; small batches,
+    missing NumPy, or any evaluation surprise (missing keys, object
+    dtypes) fall back to filtering with the per-record operation.
+    """
+    matched = _simple_predicate_terms(expression)
+    if matched is None:
+        return None
+    is_conjunction, terms = matched
+
+    def batch(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not HAS_NUMPY or len(records) < BATCH_SELECT_THRESHOLD:
+            if is_conjunction:
+                # Pure-Python fast path: chained comprehensions with the
+                # operator functions, one C-level compare per record per
+                # term instead of a full expression evaluation
+                try:
+                    survivors = records
+                    for name, op, value in terms:
+                        survivors = [record for record in survivors
+                                     if op(record[name], value)]
+                    return survivors
+                except (KeyError, TypeError):
+                    pass
+            return [record for record in records if record_op(record) is not None]
+        try:
+            mask = None
+            for name, op, value in terms:
+                column = np.asarray([record[name] for record in records])
+                if column.dtype == object:
+                    raise TypeError("mixed-type column")
+                term_mask = op(column, value)
+                if mask is None:
+                    mask = term_mask
+                elif is_conjunction:
+                    mask = mask & term_mask
+                else:
+                    mask = mask | term_mask
+            return [records[i] for i in np.nonzero(mask)[0]]
+        except Exception:
+            return [record for record in records if record_op(record) is not None]
+
+    return batch
+
+# Records sampled (evenly spaced) when probing for a stable schema
+_SCHEMA_SAMPLE = 8
+
+def records_share_schema(records: List[Dict[str, Any]]) -> bool:
+    """
+    Probe whether a batch of records shares one stable schema
+
+    Samples a handful of evenly spaced records instead of scanning the
+    whole batch; jc-style output either has a uniform schema or diverges
+    immediately, so a sparse probe is reliable and O(1).
+    """
+    if not records:
+        return False
+    keys = records[0].keys()
+    step = max(1, len(records) // _SCHEMA_SAMPLE)
+    return all(records[i].keys() == keys
+               for i in range(step, len(records), step)) \
+        and records[-1].keys() == keys
+
+def to_columns(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Convert a homogeneous record batch to a dict of NumPy column arrays
+
+    Raises TypeError on mixed-type columns: np.asarray would silently
+    coerce them (ints in an int/float column come back as floats), and
+    the columnar path must be result-identical to the per-record path.
+    """
+    cols = {}
+    for key, values in utils.to_columns(records).items():
+        first_type = type(values[0])
+        if any(type(value) is not first_type for value in values):
+            raise TypeError(f"mixed-type column: {key}")
+        cols[key] = np.asarray(values)
+    return cols
+
+def from_columns(cols: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Reconstruct a list of record dicts from column arrays"""
+    # tolist() converts NumPy scalars back to native Python types
+    return utils.from_columns({key: col.tolist() for key, col in cols.items()})
+
+def try_apply(records: List[Dict[str, Any]], pipeline: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+    """
+    Try to run a whole pipeline column-wise; return None when not eligible
+
+    Eligible when NumPy is available, the batch is large and homogeneous,
+    every expression is plain arithmetic/comparison over numeric columns,
+    and projections are flat. Select masks and derive expressions then
+    evaluate as single C loops over the column arrays instead of N
+    Python-level evaluations.
+    """
+    if not HAS_NUMPY or len(records) < COLUMNAR_THRESHOLD:
+        return None
+    if not records_share_schema(records):
+        return None
+
+    # Vet the whole pipeline before converting anything
+    plan = []
+    for pipe in pipeline:
+        if 'select' in pipe:
+            names = _vector_expr_names(pipe['select'])
+            if names is None:
+                return None
+            plan.append(('select', pipe['select'], names))
+        elif 'derive' in pipe:
+            for expression in pipe['derive'].values():
+                if _vector_expr_names(expression) is None:
+                    return None
+            plan.append(('derive', pipe['derive'], None))
+        elif 'project' in pipe:
+            if any('.' in field for field in pipe['project']):
+                return None
+            plan.append(('project', pipe['project'], None))
+        else:
+            return None
+
+    try:
+        cols = to_columns(records)
+
+        for kind, arg, names in plan:
+            if kind == 'select':
+                # Referenced columns must be numeric for a well-defined mask
+                for name in names:
+                    if name not in cols or cols[name].dtype == object:
+                        return None
+                mask = eval(compile_expr(arg), {"__builtins__": {}}, cols)
+                if not isinstance(mask, np.ndarray):
+                    return None
+                cols = {key: col[mask] for key, col in cols.items()}
+            elif kind == 'derive':
+                size = len(next(iter(cols.values()))) if cols else 0
+                # Evaluate every derivation against the pre-derive columns
+                # before assigning, matching the per-record path: later
+                # derivations never see earlier ones from the same block
+                derived = {}
+                for field, expression in arg.items():
+                    value = _eval_derive(expression, cols)
+                    derived[field] = np.broadcast_to(np.asarray(value), (size,))
+                cols.update(derived)
+            elif kind == 'project':
+                cols = {field: cols[field] for field in arg if field in cols}
+
+        return from_columns(cols)
+    except Exception:
+        # Anything unexpected (mixed dtypes, broadcast errors, ...) falls
+        # back to the per-record path
+        return None
+
+def _eval_derive(expression: str, cols: Dict[str, Any]) -> Any:
+    """
+    Evaluate a derive expression over columns, JIT-compiled when possible
+
+    Purely numeric expressions go through a cached Numba kernel (an LLVM
+    loop over the arrays); everything else, or any kernel failure, uses
+    the vectorized NumPy eval.
+    """
+    names = tuple(dict.fromkeys(_vector_expr_names(expression) or ()))
+    if names and all(name in cols and cols[name].dtype != object for name in names):
+        kernel = _numba_kernel(expression, names)
+        if kernel is not None:
+            try:
+                return kernel(*(cols[name] for name in names))
+            except Exception:
+                pass
+    return eval(compile_expr(expression), {"__builtins__": {}}, dict(cols))
@@ -7,83 +7,275 @@ import json
 from typing import List, Any, Union, TextIO
 import sys
 
+from .utils import normalize_to_records
+
 try:
     import yaml
     HAS_YAML = True
+    # Prefer libyaml's C implementation when available (several-fold faster
+    # on large multi-doc streams); fall back to the pure-Python classes
+    _YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    _YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
 except ImportError:
     yaml = None
     HAS_YAML = False
+    _YAML_LOADER = None
+    _YAML_DUMPER = None
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    orjson = None
+    HAS_ORJSON = False
+
+def _json_loads(text: Union[str, bytes]) -> Any:
+    """Parse JSON with orjson when available (C/SIMD path), stdlib otherwise"""
+    if HAS_ORJSON:
+        return orjson.loads(text)
+    return json.loads(text)
+
+def _json_dumps(obj: Any, indent: bool = False) -> str:
+    """Serialize JSON with orjson when available, stdlib otherwise"""
+    if HAS_ORJSON:
+        # Non-string keys (int mapping keys are valid YAML input) are
+        # stringified like the stdlib encoder does
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, option=option).decode()
+        except TypeError:
+            # orjson is stricter than the stdlib (e.g. ints beyond 64
+            # bits); fall back rather than fail on input json accepts
+            pass
+    return json.dumps(obj, indent=2 if indent else None)
 
 def load_stream(text: str) -> List[Any]:
     """
-    Load a stream of documents, preferring YAML multi-doc, falling back to JSON
-    
+    Load a stream of documents, sniffing the format before parsing
+
+    JSON input (the common case via jc) is routed straight to the JSON
+    parser instead of paying for a full YAML tokenization pass; YAML is
+    reserved for input that actually looks like YAML (e.g. '---' markers).
+
     Returns:
         List of documents. YAML multi-doc → [doc0, doc1, ...], single → [doc]
     """
-    if not text.strip():
+    stripped = text.lstrip()
+    if not stripped:
         return []
-    
-    # Try YAML first (handles multi-doc and single doc)
+
+    # JSON fast path: containers, quoted strings, numbers and the JSON
+    # literals are almost always JSON ('-' alone is excluded since it
+    # opens YAML sequences and '---' markers)
+    head = stripped[0]
+    if (head in '{["' or head.isdigit()
+            or (head == '-' and len(stripped) > 1 and stripped[1].isdigit())
+            or stripped[:4] in ('true', 'null') or stripped[:5] == 'false'):
+        try:
+            return [_json_loads(text)]
+        except Exception:
+            pass
+        # NDJSON: one JSON object per line
+        if head == '{':
+            lines = [line for line in stripped.splitlines() if line.strip()]
+            if len(lines) > 1:
+                try:
+                    return [[_json_loads(line) for line in lines]]
+                except Exception:
+                    pass
+
+    # YAML path (handles multi-doc and single doc)
     if HAS_YAML:
         try:
-            docs = list(yaml.safe_load_all(text))
+            docs = list(yaml.load_all(text, Loader=_YAML_LOADER))
             # Filter out None documents from empty YAML docs
             docs = [doc for doc in docs if doc is not None]
             if len(docs) > 0:
                 return docs
         except Exception:
             pass
-    
+
     # Fall back to JSON
     try:
-        return [json.loads(text)]
-    except json.JSONDecodeError as e:
+        return [_json_loads(text)]
+    except Exception as e:
         raise ValueError(f"Invalid JSON input: {e}")
 
-def normalize_to_records(doc: Any) -> List[dict]:
+def iter_stream(text: str):
     """
-    Normalize a document to a list of record dictionaries for pipeline processing
-    
+    Lazily iterate documents from a stream, sniffing the format first
+
+    Same format handling as load_stream, but YAML documents are yielded
+    as yaml.load_all produces them instead of being materialized into a
+    list — consumers that only need the first document (single-stage
+    pipelines over multi-doc input) stop parsing after it. A YAML error
+    after some documents were already yielded ends the iteration; the
+    consumer has them and there is nothing to fall back to.
+    """
+    stripped = text.lstrip()
+    if not stripped:
+        return
+
+    head = stripped[0]
+    if (head in '{["' or head.isdigit()
+            or (head == '-' and len(stripped) > 1 and stripped[1].isdigit())
+            or stripped[:4] in ('true', 'null') or stripped[:5] == 'false'):
+        try:
+            doc = _json_loads(text)
+        except Exception:
+            doc = None
+        else:
+            yield doc
+            return
+        if head == '{':
+            lines = [line for line in stripped.splitlines() if line.strip()]
+            if len(lines) > 1:
+                try:
+                    docs = [_json_loads(line) for line in lines]
+                except Exception:
+                    pass
+                else:
+                    yield docs
+                    return
+
+    if HAS_YAML:
+        yielded = False
+        try:
+            for doc in yaml.load_all(text, Loader=_YAML_LOADER):
+                if doc is not None:
+                    yielded = True
+                    yield doc
+        except Exception:
+            if yielded:
+                return
+        else:
+            if yielded:
+                return
+
+    try:
+        yield _json_loads(text)
+    except Exception as e:
+        raise ValueError(f"Invalid JSON input: {e}")
+
+# Chunk size for streaming reads (64 KB)
+CHUNK_SIZE = 65536
+
+def iter_ndjson(stream, initial: bytes = b"") -> Any:
+    """
+    Iterate JSON documents from a line-delimited (NDJSON) binary stream
+
+    Reads the stream in CHUNK_SIZE blocks and yields one parsed document
+    per line, so memory stays O(record) instead of O(input).
+
     Args:
-        doc: Document (dict, list of dicts, or other)
-        
-    Returns:
-        List of record dictionaries
-    """
-    if isinstance(doc, list):
-        # If it's a list of dicts, return as-is
-        if all(isinstance(item, dict) for item in doc):
-            return doc
-        # If it's a mixed list, wrap each item
-        return [{"value": item} if not isinstance(item, dict) else item for item in doc]
-    elif isinstance(doc, dict):
-        return [doc]
-    else:
-        # Wrap primitive values
-        return [{"value": doc}]
+        stream: Binary stream to read from
+        initial: Bytes already consumed from the stream (e.g. a sniff chunk)
+    """
+    buf = initial
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        if chunk:
+            buf += chunk
+        start = 0
+        while True:
+            newline = buf.find(b'\n', start)
+            if newline < 0:
+                break
+            line = buf[start:newline].strip()
+            start = newline + 1
+            if line:
+                yield _json_loads(line)
+        buf = buf[start:]
+        if not chunk:
+            break
+    # Trailing record without a final newline
+    tail = buf.strip()
+    if tail:
+        yield _json_loads(tail)
+
+def looks_like_ndjson(chunk: bytes) -> bool:
+    """
+    Check whether an initial input chunk looks like NDJSON
+
+    True when the first non-whitespace byte opens a JSON object and the
+    first complete line parses as standalone JSON.
+    """
+    stripped = chunk.lstrip()
+    if not stripped.startswith(b'{'):
+        return False
+    newline = stripped.find(b'\n')
+    if newline < 0:
+        return False
+    line = stripped[:newline].strip()
+    try:
+        _json_loads(line)
+        return True
+    except Exception:
+        return False
+
+def write_json_stream(records: Any, file: TextIO) -> None:
+    """
+    Write an iterable of records as an indented JSON array, incrementally
+
+    Each record is serialized and written on its own instead of
+    materializing the whole array as one string, so downstream consumers
+    see bytes as soon as the first record is ready and peak memory stays
+    at one record's worth of output.
+    """
+    first = True
+    file.write('[')
+    for record in records:
+        file.write('\n' if first else ',\n')
+        # Indent the record to match json.dump(result, indent=2)
+        file.write('  ' + _json_dumps(record, indent=True).replace('\n', '\n  '))
+        first = False
+    file.write(']\n' if first else '\n]\n')
+
+def write_ndjson_stream(records: Any, file: TextIO) -> None:
+    """
+    Write records as NDJSON: one compact JSON document per line
+
+    Downstream consumers (jq, another jaql, ...) can start processing as
+    soon as the first line arrives instead of waiting for a closing
+    bracket.
+    """
+    for record in records:
+        file.write(_json_dumps(record))
+        file.write('\n')
 
 def output_result(result: Any, output_format: str = "json", file: TextIO = None) -> None:
     """
     Output result in specified format to file or stdout
-    
+
     Args:
         result: Data to output
-        output_format: "json" or "yaml"
+        output_format: "json", "yaml" or "ndjson"
         file: Output file (defaults to stdout)
     """
     if file is None:
         file = sys.stdout
-    
-    if output_format == "yaml" and HAS_YAML:
-        # Use safe_dump with clean formatting
-        yaml.safe_dump(result, file, 
-                      default_flow_style=False, 
-                      sort_keys=False, 
-                      indent=2)
+
+    if output_format == "ndjson":
+        if isinstance(result, list):
+            write_ndjson_stream(result, file)
+        else:
+            file.write(_json_dumps(result))
+            file.write('\n')
+    elif output_format == "yaml" and HAS_YAML:
+        # Use the C dumper (safe-dump semantics) with clean formatting
+        yaml.dump(result, file,
+                  Dumper=_YAML_DUMPER,
+                  default_flow_style=False,
+                  sort_keys=False,
+                  indent=2)
+    elif isinstance(result, list):
+        # Default to JSON; stream list results record-by-record
+        write_json_stream(result, file)
     else:
         # Default to JSON
-        json.dump(result, file, indent=2)
+        file.write(_json_dumps(result, indent=True))
         file.write('\n')  # Add newline for clean terminal output
 
 def load_from_file_or_stdin(input_file: str = None) -> str:
@@ -5,13 +5,16 @@ JAQL pipeline parser and validator
 import yaml
 from typing import Dict, List, Any
 
+# Prefer libyaml's C loader when available (same safe-load semantics)
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 def load_pipeline(path: str) -> List[Dict[str, Any]]:
     """
     Load and validate YAML pipeline configuration
     """
     try:
         with open(path, 'r') as f:
-            config = yaml.safe_load(f)
+            config = yaml.load(f, Loader=_YAML_LOADER)
     except FileNotFoundError:
         raise ValueError(f"Pipeline file not found: {path}")
     except yaml.YAMLError as e:
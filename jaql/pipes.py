@@ -4,46 +4,129 @@ Enhanced with better expression evaluation for JC compatibility
 """
 
 import json
-from typing import Any, Dict, List, Union
-from .utils import safe_eval, deep_get
-
-def normalize_to_records(data: Any) -> List[Dict[str, Any]]:
-    """Normalize input to list of records for processing"""
-    if isinstance(data, dict):
-        return [data]
-    elif isinstance(data, list) and all(isinstance(item, dict) for item in data):
-        return data
-    else:
-        # Wrap non-dict data as a record
-        return [{"value": data}]
+import sys
+from functools import lru_cache
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, Union
+from .utils import (compile_expr, compile_row_fn, expr_required_names,
+                    expr_short_circuits, normalize_to_records,
+                    SAFE_BUILTINS, DefaultContext, _MISSING)
+from . import columnar
+
+# Sentinel distinguishing "key absent" from a stored falsy value
+_SENTINEL = object()
+
+def _pipeline_key(pipeline: List[Dict[str, Any]]) -> tuple:
+    """Convert a pipeline to a hashable key for the compile cache"""
+    key = []
+    for pipe in pipeline:
+        if 'select' in pipe:
+            key.append(('select', pipe['select']))
+        elif 'project' in pipe:
+            key.append(('project', tuple(pipe['project'])))
+        elif 'derive' in pipe:
+            key.append(('derive', tuple(pipe['derive'].items())))
+    return tuple(key)
+
+@lru_cache(maxsize=128)
+def _compile_pipeline(key: tuple) -> List[Callable]:
+    """
+    Compile a pipeline (by key) into a list of per-record operations
+
+    Each operation closes over its pre-compiled expressions, so repeated
+    runs of the same pipeline — including every run_pipeline invocation on
+    new data — skip all parse/compile work.
+    """
+    ops = []
+    # Track whether the record flowing into each op is already a fresh
+    # dict built by an earlier op (and therefore safe to mutate in place)
+    owned = False
+    for kind, arg in key:
+        if kind == 'select':
+            ops.append(_make_select(arg))
+        elif kind == 'project':
+            ops.append(_make_project(arg))
+            owned = True
+        elif kind == 'derive':
+            ops.append(_make_derive(arg, owns_record=owned))
+            owned = True
+    return ops
+
+def compile_pipeline(pipeline: List[Dict[str, Any]]) -> List[Callable]:
+    """Compile a pipeline into its cached per-record operations"""
+    return _compile_pipeline(_pipeline_key(pipeline))
+
+def _run_ops(records: List[Dict[str, Any]], ops: List[Callable]) -> List[Dict[str, Any]]:
+    """
+    Run compiled per-record operations as one fused pass
+
+    Fusing the stages avoids materializing an intermediate record list per
+    stage: each record flows through the whole chain before the next one
+    is touched, and only survivors are appended to the output.
+    """
+    # Leading selects with a batch (vectorized) form filter the whole
+    # list up front before records enter the per-record loop
+    start = 0
+    for op in ops:
+        batch = getattr(op, 'batch', None)
+        if batch is None:
+            break
+        records = batch(records)
+        start += 1
+    ops = ops[start:]
+
+    result = []
+    append = result.append
+
+    if not ops:
+        return records
+
+    # Single-op chains (the most common pipelines after batch filtering)
+    # skip the inner dispatch loop entirely
+    if len(ops) == 1:
+        op = ops[0]
+        for record in records:
+            record = op(record)
+            if record is not None:
+                append(record)
+        return result
 
-def apply_pipeline(data: Any, pipeline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    for record in records:
+        for op in ops:
+            record = op(record)
+            if record is None:
+                break
+        else:
+            append(record)
+    return result
+
+def apply_pipeline(data: Any, pipeline: List[Dict[str, Any]], already_records: bool = False) -> List[Dict[str, Any]]:
     """
     Apply a sequence of pipe operations to data
-    
+
     Args:
         data: Input data (dict, list of dicts, or other)
         pipeline: List of pipe operations from YAML config
-        
+        already_records: Skip normalization; data is a known list of dicts
+
     Returns:
         List of transformed records
     """
-    # Normalize input to list of records
-    if isinstance(data, list) and all(isinstance(item, dict) for item in data):
-        records = data  # Already normalized
+    # Normalize input to list of records unless the caller already did
+    if already_records:
+        records = data
     else:
         records = normalize_to_records(data)
-    
-    # Apply each pipe operation in sequence
-    for pipe in pipeline:
-        if 'select' in pipe:
-            records = pipe_select(records, pipe['select'])
-        elif 'project' in pipe:
-            records = pipe_project(records, pipe['project'])
-        elif 'derive' in pipe:
-            records = pipe_derive(records, pipe['derive'])
-    
-    return records
+
+    # Columnar fast path: large homogeneous numeric batches evaluate
+    # select/derive as vectorized column operations
+    if columnar.HAS_NUMPY and len(records) >= columnar.COLUMNAR_THRESHOLD:
+        result = columnar.try_apply(records, pipeline)
+        if result is not None:
+            return result
+
+    # Run all compiled operations as a single fused pass over the records
+    return _run_ops(records, _compile_pipeline(_pipeline_key(pipeline)))
 
 def pipe_select(records: List[Dict[str, Any]], expression: str) -> List[Dict[str, Any]]:
     """
@@ -57,16 +140,76 @@ def pipe_select(records: List[Dict[str, Any]], expression: str) -> List[Dict[str
     Returns:
         Filtered list of records
     """
-    result = []
-    for record in records:
+    return _run_ops(records, [_make_select(expression)])
+
+@lru_cache(maxsize=256)
+def _make_select(expression: str) -> Callable:
+    """Compile a select expression into a per-record operation"""
+    required = expr_required_names(expression)
+    # Expressions without short-circuiting constructs are guaranteed the
+    # NameError outcome when a referenced field is missing, so a cheap
+    # presence check can drop the record without evaluating; or/and/ifexp
+    # expressions may still pass and must actually be evaluated
+    strict = not expr_short_circuits(expression)
+    row = compile_row_fn(expression)
+    try:
+        code = compile_expr(expression)
+    except Exception:
+        code = None
+    # DefaultContext resolves names the AST analysis couldn't see
+    # (dynamic access, short-circuit misses) to a falsy sentinel
+    # instead of NameError
+    env = DefaultContext()
+
+    def eval_op(record: Dict[str, Any]) -> Union[Dict[str, Any], None]:
+        # Evaluate the compiled code object against a reusable
+        # environment dict (only the record bindings change per record)
+        if code is None:
+            return None
+        env.clear()
+        env["__builtins__"] = SAFE_BUILTINS
+        env.update(record)
+        env["rec"] = record
+        env["get"] = record.get
         try:
-            # Use enhanced safe_eval with 'rec' binding and 'get' helper
-            if safe_eval(expression, record):
-                result.append(record)
+            if eval(code, env):
+                return record
         except Exception:
-            # Skip records that cause evaluation errors
-            continue
-    return result
+            # Drop records that cause evaluation errors
+            pass
+        return None
+
+    if row is not None:
+        # Preferred path: a prebuilt plain function runs on fastlocals and
+        # needs no per-record environment dict at all
+        fn, names = row
+
+        def op(record: Dict[str, Any]) -> Union[Dict[str, Any], None]:
+            if not required <= record.keys():
+                # Missing fields: plain expressions fail exactly like the
+                # NameError the eval would raise; short-circuiting ones
+                # may still pass, so evaluate them for real
+                return None if strict else eval_op(record)
+            try:
+                if fn(record, record.get, *[record[name] for name in names]):
+                    return record
+            except Exception:
+                # Drop records that cause evaluation errors
+                pass
+            return None
+    else:
+        def op(record: Dict[str, Any]) -> Union[Dict[str, Any], None]:
+            if strict and not required <= record.keys():
+                return None
+            return eval_op(record)
+
+    # Simple comparison predicates additionally get a whole-batch form
+    # that _run_ops can apply as one vectorized filter
+    batch = columnar.make_batch_select(expression, op)
+    if batch is not None:
+        op.batch = batch
+
+    return op
 
 def pipe_project(records: List[Dict[str, Any]], fields: List[str]) -> List[Dict[str, Any]]:
     """
@@ -80,22 +223,56 @@ def pipe_project(records: List[Dict[str, Any]], fields: List[str]) -> List[Dict[
     Returns:
         Records with only the specified fields
     """
-    result = []
-    for record in records:
-        projected = {}
-        for field in fields:
-            if '.' in field:
-                # Handle nested field access
-                value = deep_get(record, field)
-                if value is not None:
-                    # Preserve the full path in the output
-                    projected[field] = value
-            else:
-                # Simple field access
-                if field in record:
-                    projected[field] = record[field]
-        result.append(projected)
-    return result
+    return _run_ops(records, [_make_project(tuple(fields))])
+
+@lru_cache(maxsize=256)
+def _make_project(fields: tuple) -> Callable:
+    """Compile a projection field list into a per-record operation"""
+    # Partition the fields once: flat fields go through a prebuilt
+    # itemgetter (one C call per record), dotted paths are pre-split so
+    # the per-record loop never touches the path string. Interned names
+    # match parser-interned record keys on a pointer compare
+    flat_fields = tuple(sys.intern(field) for field in fields if '.' not in field)
+    nested_specs = tuple(
+        (field, tuple(sys.intern(part) for part in field.split('.')))
+        for field in fields if '.' in field
+    )
+    getter = itemgetter(*flat_fields) if flat_fields else None
+    single_flat = len(flat_fields) == 1
+
+    def op(record: Dict[str, Any]) -> Dict[str, Any]:
+        if getter is None:
+            projected = {}
+        else:
+            try:
+                values = getter(record)
+                if single_flat:
+                    projected = {flat_fields[0]: values}
+                else:
+                    projected = dict(zip(flat_fields, values))
+            except KeyError:
+                # Some field is missing: tolerant path with one lookup per
+                # field (get with sentinel) instead of contains + getitem
+                projected = {}
+                for field in flat_fields:
+                    value = record.get(field, _SENTINEL)
+                    if value is not _SENTINEL:
+                        projected[field] = value
+        for field, parts in nested_specs:
+            # Nested field access: walk the pre-split path (EAFP — the
+            # happy path pays no isinstance checks)
+            value = record
+            try:
+                for part in parts:
+                    value = value[part]
+            except (KeyError, TypeError, IndexError):
+                value = None
+            if value is not None:
+                # Preserve the full path in the output
+                projected[field] = value
+        return projected
+
+    return op
 
 def pipe_derive(records: List[Dict[str, Any]], derivations: Dict[str, str]) -> List[Dict[str, Any]]:
     """
@@ -109,16 +286,75 @@ def pipe_derive(records: List[Dict[str, Any]], derivations: Dict[str, str]) -> L
     Returns:
         Records with additional derived fields
     """
-    result = []
-    for record in records:
-        # Create new record with derived fields
-        new_record = dict(record)
-        for field_name, expression in derivations.items():
+    return _run_ops(records, [_make_derive(tuple(derivations.items()))])
+
+@lru_cache(maxsize=256)
+def _make_derive(derivations: tuple, owns_record: bool = False) -> Callable:
+    """
+    Compile derivation (field, expression) pairs into a per-record operation
+
+    When owns_record is true the incoming record was built by an earlier
+    op in the chain, so derived fields are added in place instead of
+    copying the dict; caller-supplied records are never mutated.
+    """
+    # Compile each derivation once, preferring the plain-function path
+    # (fastlocals); entries are (field, row_fn, names, code, required, strict)
+    compiled = []
+    for field_name, expression in derivations:
+        required = expr_required_names(expression)
+        strict = not expr_short_circuits(expression)
+        row = compile_row_fn(expression)
+        fn, names = row if row is not None else (None, ())
+        try:
+            code = compile_expr(expression)
+        except Exception:
+            code = None
+        compiled.append((field_name, fn, names, code, required, strict))
+
+    # Reusable environment dict, only needed for the eval fallback;
+    # missing names resolve to the falsy sentinel instead of NameError
+    env = DefaultContext()
+
+    def op(record: Dict[str, Any]) -> Dict[str, Any]:
+        # Evaluate every derivation against the pre-derive record before
+        # assigning, so later derivations never see earlier ones
+        new_record = record if owns_record else {**record}
+        env_ready = False
+        values = []
+        append = values.append
+        for field_name, fn, names, code, required, strict in compiled:
+            present = required <= record.keys()
+            if fn is not None and present:
+                try:
+                    append(fn(record, record.get,
+                              *[record[name] for name in names]))
+                    continue
+                except Exception:
+                    # Derivation failed; same falsy result safe_eval produced
+                    append(False)
+                    continue
+            if code is None or (strict and not present):
+                # Unparseable expression, or a missing field in a plain
+                # expression: same falsy result safe_eval produced.
+                # Short-circuiting expressions fall through to a real
+                # evaluation — they may not touch the missing field
+                append(False)
+                continue
+            if not env_ready:
+                env.clear()
+                env["__builtins__"] = SAFE_BUILTINS
+                env.update(record)
+                env["rec"] = record
+                env["get"] = record.get
+                env_ready = True
             try:
-                # Use enhanced safe_eval with 'rec' binding and 'get' helper
-                new_record[field_name] = safe_eval(expression, record)
+                value = eval(code, env)
+                # Never let the sentinel leak into serialized output
+                append(False if value is _MISSING else value)
             except Exception:
-                # Set to None if derivation fails
-                new_record[field_name] = None
-        result.append(new_record)
-    return result
+                append(False)
+        for (field_name, _, _, _, _, _), value in zip(compiled, values):
+            new_record[field_name] = value
+        return new_record
+
+    return op
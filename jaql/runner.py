@@ -3,21 +3,29 @@ JAQL pipeline runner: enhanced with multi-stage and multi-document support
 Enables correlation of data from multiple sources (like ps + free)
 """
 
+import hashlib
+import os
+import pickle
 import sys
 import json
 from typing import Any, Dict, List
 from pathlib import Path
 
 from .parser import load_pipeline, validate_pipeline
-from .pipes import apply_pipeline
-from .io import load_stream, normalize_to_records, output_result, load_from_file_or_stdin
+from .pipes import apply_pipeline, compile_pipeline
+from .io import (CHUNK_SIZE, load_stream, iter_stream, normalize_to_records,
+                 output_result, iter_ndjson, looks_like_ndjson,
+                 write_json_stream, write_ndjson_stream)
 
 try:
     import yaml
     HAS_YAML = True
+    # Prefer libyaml's C loader when available (same safe-load semantics)
+    _YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 except ImportError:
     yaml = None
     HAS_YAML = False
+    _YAML_LOADER = None
 
 def run_pipeline_single_stage(records: List[Dict[str, Any]], pipeline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
@@ -30,7 +38,7 @@ def run_pipeline_single_stage(records: List[Dict[str, Any]], pipeline: List[Dict
     Returns:
         List of transformed records
     """
-    return apply_pipeline(records, pipeline)
+    return apply_pipeline(records, pipeline, already_records=True)
 
 def run_pipeline_multi_stage(docs: List[Any], spec: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -43,24 +51,30 @@ def run_pipeline_multi_stage(docs: List[Any], spec: Dict[str, Any]) -> Dict[str,
     Returns:
         Dictionary of stage results or named outputs
     """
-    stage_results = {}
-    
-    # Execute each stage
+    # Compile every stage up front: bad document indexes and expression
+    # compilation are resolved before any records are processed, and the
+    # execution loop below touches only pre-compiled pipelines
+    compiled_stages = []
     for stage_name, stage_config in spec["stages"].items():
         # Get input document index (defaults to 0)
         doc_index = stage_config.get("input", 0)
-        
+
         if doc_index >= len(docs):
             raise ValueError(f"Stage '{stage_name}': input document index {doc_index} out of range (have {len(docs)} docs)")
-        
-        # Normalize document to records and apply pipes
-        records = normalize_to_records(docs[doc_index])
-        
+
         # Get pipeline operations (support both 'pipes' and 'steps' keys for flexibility)
         pipes = stage_config.get("pipes") or stage_config.get("steps", [])
-        
-        # Apply pipeline operations
-        result = apply_pipeline(records, pipes)
+        compile_pipeline(pipes)
+        compiled_stages.append((stage_name, doc_index, pipes))
+
+    stage_results = {}
+
+    # Execute each stage
+    for stage_name, doc_index, pipes in compiled_stages:
+        # Normalize document to records and apply pipes (the compile step
+        # above means apply_pipeline hits the pipeline cache)
+        records = normalize_to_records(docs[doc_index])
+        result = apply_pipeline(records, pipes, already_records=True)
         stage_results[stage_name] = result
     
     # Handle outputs specification
@@ -77,36 +91,120 @@ def run_pipeline_multi_stage(docs: List[Any], spec: Dict[str, Any]) -> Dict[str,
         # Return all stage results if no outputs specified
         return stage_results
 
+# Sentinel distinguishing "no documents in the stream" from a parsed
+# JSON null document (which is a valid first document)
+_NO_DOC = object()
+
+# On-disk cache of parsed pipeline specs (see load_pipeline_spec)
+_SPEC_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME",
+                                      Path.home() / ".cache")) / "jaql"
+
+def _spec_cache_path(pipeline_path: str, stat: os.stat_result) -> Path:
+    """Cache file path for a pipeline, keyed by absolute path, mtime and size"""
+    key = f"{os.path.abspath(pipeline_path)}:{stat.st_mtime_ns}:{stat.st_size}"
+    return _SPEC_CACHE_DIR / (hashlib.sha1(key.encode()).hexdigest() + ".pkl")
+
 def load_pipeline_spec(pipeline_path: str) -> Dict[str, Any]:
     """
     Load pipeline specification from YAML file
-    
+
+    Parsed specs are cached on disk keyed by (path, mtime, size), so
+    repeated CLI invocations of the same pipeline skip the YAML parse.
+    Cache reads and writes are best-effort; any failure just re-parses.
+
     Args:
         pipeline_path: Path to pipeline file
-        
+
     Returns:
         Pipeline specification dictionary
     """
+    cache_path = None
+    try:
+        cache_path = _spec_cache_path(pipeline_path, os.stat(pipeline_path))
+        with open(cache_path, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        pass
+
     try:
         pipeline_text = Path(pipeline_path).read_text()
     except FileNotFoundError:
         raise ValueError(f"Pipeline file not found: {pipeline_path}")
-    
+
     if HAS_YAML:
         try:
-            return yaml.safe_load(pipeline_text)
+            spec = yaml.load(pipeline_text, Loader=_YAML_LOADER)
         except yaml.YAMLError as e:
             raise ValueError(f"Invalid YAML in {pipeline_path}: {e}")
     else:
         try:
-            return json.loads(pipeline_text)
+            spec = json.loads(pipeline_text)
         except json.JSONDecodeError as e:
             raise ValueError(f"Invalid JSON in {pipeline_path}: {e}")
 
+    if cache_path is not None:
+        try:
+            _SPEC_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            # Write-then-rename keeps concurrent readers from seeing a
+            # partially written cache entry
+            tmp_path = cache_path.with_suffix(f".tmp{os.getpid()}")
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(spec, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except Exception:
+            pass
+
+    return spec
+
+def run_pipeline_streaming(pipeline: List[Dict[str, Any]], in_stream, out_stream,
+                           initial: bytes = b"", output_format: str = "json") -> None:
+    """
+    Stream NDJSON records through a compiled pipeline one at a time
+
+    Keeps the memory high-water mark at O(record): each input line is
+    parsed, run through the compiled operation chain, and written out
+    before the next line is read.
+
+    Args:
+        pipeline: List of pipe operations
+        in_stream: Binary input stream of line-delimited JSON records
+        out_stream: Text output stream (receives a JSON array, or NDJSON
+            lines when output_format is "ndjson")
+        initial: Bytes already consumed from in_stream (sniff chunk)
+        output_format: "json" or "ndjson"
+    """
+    ops = compile_pipeline(pipeline)
+
+    def transformed():
+        for record in iter_ndjson(in_stream, initial=initial):
+            if not isinstance(record, dict):
+                record = {"value": record}
+            for op in ops:
+                record = op(record)
+                if record is None:
+                    break
+            else:
+                yield record
+
+    if output_format == "ndjson":
+        # NDJSON in, NDJSON out: fully zero-materialization
+        write_ndjson_stream(transformed(), out_stream)
+    else:
+        write_json_stream(transformed(), out_stream)
+
+def _validate_or_exit(pipeline: List[Dict[str, Any]]) -> None:
+    """Validate a single-stage pipeline, printing errors and exiting on failure"""
+    validation_errors = validate_pipeline(pipeline)
+    if validation_errors:
+        print("Pipeline validation errors:", file=sys.stderr)
+        for error in validation_errors:
+            print(f"  - {error}", file=sys.stderr)
+        sys.exit(1)
+
 def run_pipeline(pipeline_path: str, input_file: str = None, output_file: str = None, output_format: str = "json") -> None:
     """
     Run a JAQL pipeline on input data (enhanced version)
-    
+
     Args:
         pipeline_path: Path to YAML/JSON pipeline file
         input_file: Path to input file (None for stdin)
@@ -116,45 +214,73 @@ def run_pipeline(pipeline_path: str, input_file: str = None, output_file: str =
     try:
         # Load pipeline specification
         spec = load_pipeline_spec(pipeline_path)
-        
-        # Load input data as stream of documents
-        input_text = load_from_file_or_stdin(input_file)
-        docs = load_stream(input_text)
-        
-        if not docs:
-            raise ValueError("No input documents found")
-        
+
+        # Open input as a binary stream and sniff the first chunk so
+        # NDJSON input can be processed record-at-a-time
+        if input_file:
+            try:
+                in_stream = open(input_file, 'rb')
+            except FileNotFoundError:
+                raise ValueError(f"Input file not found: {input_file}")
+        else:
+            in_stream = sys.stdin.buffer
+
+        try:
+            first_chunk = in_stream.read(CHUNK_SIZE)
+
+            # Streaming fast path: single-stage pipeline over NDJSON input
+            if (output_format in ("json", "ndjson") and "stages" not in spec
+                    and "pipes" in spec and looks_like_ndjson(first_chunk)):
+                pipeline = spec["pipes"]
+                _validate_or_exit(pipeline)
+                if output_file:
+                    with open(output_file, 'w') as f:
+                        run_pipeline_streaming(pipeline, in_stream, f,
+                                               initial=first_chunk, output_format=output_format)
+                else:
+                    run_pipeline_streaming(pipeline, in_stream, sys.stdout,
+                                           initial=first_chunk, output_format=output_format)
+                return
+
+            # Buffered path: read the rest and parse as a document stream
+            input_text = (first_chunk + in_stream.read()).decode('utf-8', errors='replace')
+        finally:
+            if input_file:
+                in_stream.close()
+
         # Determine pipeline type and execute
         if "stages" in spec:
-            # Multi-stage pipeline
+            # Multi-stage pipeline: stages index into the document list,
+            # so materialize the whole stream
+            docs = load_stream(input_text)
+            if not docs:
+                raise ValueError("No input documents found")
             result = run_pipeline_multi_stage(docs, spec)
         else:
             # Traditional single-stage pipeline (backward compatibility)
             if "pipes" not in spec:
                 raise ValueError("Pipeline must contain either 'pipes' or 'stages'")
-            
-            # Use first document for single-stage pipeline
-            records = normalize_to_records(docs[0])
-            
+
+            # Single-stage pipelines only use the first document, so stop
+            # parsing the stream after it (lazy iteration)
+            first_doc = next(iter_stream(input_text), _NO_DOC)
+            if first_doc is _NO_DOC:
+                raise ValueError("No input documents found")
+            records = normalize_to_records(first_doc)
+
             # Validate traditional pipeline format
             pipeline = spec["pipes"]
-            validation_errors = validate_pipeline(pipeline)
-            
-            if validation_errors:
-                print("Pipeline validation errors:", file=sys.stderr)
-                for error in validation_errors:
-                    print(f"  - {error}", file=sys.stderr)
-                sys.exit(1)
-            
+            _validate_or_exit(pipeline)
+
             result = run_pipeline_single_stage(records, pipeline)
-        
+
         # Output result
         if output_file:
             with open(output_file, 'w') as f:
                 output_result(result, output_format, f)
         else:
             output_result(result, output_format)
-            
+
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
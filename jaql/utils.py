@@ -4,90 +4,299 @@ Supports hyphenated keys from jc output via 'rec' binding and 'get()' helper
 """
 
 import ast
+import sys
+from functools import lru_cache
 from typing import Any, Dict, List, Union
 
+class _MissingType:
+    """Falsy sentinel distinguishing "name absent" from a stored None"""
+    __slots__ = ()
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return '<missing>'
+
+_MISSING = _MissingType()
+
+class DefaultContext(dict):
+    """
+    Evaluation globals whose missing names resolve to the falsy sentinel
+
+    eval() honors __missing__ on dict subclasses, so an expression that
+    reads an absent record field gets _MISSING back instead of paying for
+    a raised-and-caught NameError. Comparisons against the sentinel are
+    falsy or raise (both already handled), and callers map a bare
+    _MISSING result to False so it never escapes into output.
+
+    Name lookup consults __missing__ before the __builtins__ fallback, so
+    the safe built-ins must raise KeyError here to stay resolvable.
+    """
+    __slots__ = ()
+
+    def __missing__(self, key):
+        if key in SAFE_BUILTINS:
+            raise KeyError(key)
+        return _MISSING
+
+# Allow only safe built-ins (shared by all evaluations)
+SAFE_BUILTINS = {
+    "len": len,
+    "min": min,
+    "max": max,
+    "sum": sum,
+    "abs": abs,
+    "str": str,
+    "int": int,
+    "float": float,
+    "bool": bool,
+}
+
+# Names resolved by the eval environment itself rather than the record
+_EVAL_HELPERS = frozenset(SAFE_BUILTINS) | {"rec", "get"}
+
+@lru_cache(maxsize=1024)
+def expr_required_names(expr: str) -> frozenset:
+    """
+    Bare variable names an expression reads from the record
+
+    Built-ins and the rec/get helpers are excluded. Hot loops use this to
+    check key presence up front instead of paying for a raised-and-caught
+    NameError on every record that misses a field.
+    """
+    try:
+        tree = ast.parse(expr, mode='eval')
+    except Exception:
+        return frozenset()
+    loads = set()
+    bound = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            (loads if isinstance(node.ctx, ast.Load) else bound).add(node.id)
+        elif isinstance(node, ast.Lambda):
+            args = node.args
+            bound.update(a.arg for a in
+                         args.args + args.posonlyargs + args.kwonlyargs)
+    # Names bound inside the expression (comprehension targets, lambda
+    # parameters) don't come from the record
+    return frozenset(loads - bound) - _EVAL_HELPERS
+
+@lru_cache(maxsize=1024)
+def expr_short_circuits(expr: str) -> bool:
+    """
+    Whether an expression contains short-circuiting constructs
+
+    and/or chains and conditional expressions can produce a result
+    without evaluating every name they mention, so a missing referenced
+    field doesn't necessarily mean the NameError outcome — callers must
+    evaluate such expressions instead of failing fast on a presence
+    check.
+    """
+    try:
+        tree = ast.parse(expr, mode='eval')
+    except Exception:
+        return False
+    return any(isinstance(node, (ast.BoolOp, ast.IfExp))
+               for node in ast.walk(tree))
+
+@lru_cache(maxsize=1024)
+def compile_row_fn(expr: str):
+    """
+    Compile an expression into a plain function over its record fields
+
+    Returns (fn, names) where fn(rec, get, *values) takes the record, its
+    get method and the field values named by the expression, in sorted
+    order. Calling a prebuilt function uses fastlocals and skips the
+    globals-dict setup the eval path needs. Returns None when the
+    expression can't be wrapped in a lambda; callers fall back to
+    safe_eval-style evaluation.
+    """
+    names = tuple(sorted(expr_required_names(expr)))
+    params = ", ".join(("rec", "get") + names)
+    try:
+        return eval(f"lambda {params}: ({expr})",
+                    {"__builtins__": SAFE_BUILTINS}), names
+    except Exception:
+        return None
+
+@lru_cache(maxsize=1024)
+def trivial_expr(expr: str):
+    """
+    Classify expressions that don't need evaluation at all
+
+    Returns ('const', value) for a literal, ('name', id) for a bare
+    variable reference, or None for anything else. Pipelines full of
+    'derive: {status: \"'HIGH'\"}'-style literals and column renames can
+    then skip the eval machinery entirely.
+    """
+    try:
+        body = ast.parse(expr, mode='eval').body
+    except Exception:
+        return None
+    if isinstance(body, ast.Constant):
+        return ('const', body.value)
+    if isinstance(body, ast.Name) and body.id not in _EVAL_HELPERS:
+        return ('name', body.id)
+    return None
+
+@lru_cache(maxsize=1024)
+def compile_expr(expr: str):
+    """
+    Compile an expression string to a code object, cached by expression text
+
+    Pipelines evaluate the same expression once per record, so caching the
+    compile step turns O(N·parse) into O(parse + N·eval). compile() parses
+    internally, so handing it the source string directly skips building
+    the Python-level AST objects an explicit ast.parse would create.
+    """
+    return compile(expr, '<jaql>', 'eval')
+
+def safe_eval_code(code, context: Dict[str, Any]) -> Any:
+    """
+    Evaluate an already-compiled expression against context
+
+    Same environment as safe_eval: bare context variables, a 'rec' binding
+    for hyphenated keys, and a 'get' helper for safe key access.
+    """
+    try:
+        # One dict display instead of an empty dict plus update calls;
+        # missing names resolve via __missing__ instead of NameError
+        safe_globals = DefaultContext(
+            {"__builtins__": SAFE_BUILTINS, **context,
+             "rec": context, "get": context.get})
+        result = eval(code, safe_globals)
+        return False if result is _MISSING else result
+    except Exception:
+        # Return False for any evaluation errors (used in select operations)
+        return False
+
 def safe_eval(expr: str, context: Dict[str, Any]) -> Any:
     """
     Safely evaluate expressions against context with limited built-ins
     Enhanced with 'rec' binding and 'get' helper for hyphenated keys
     """
+    trivial = trivial_expr(expr)
+    if trivial is not None:
+        kind, arg = trivial
+        if kind == 'const':
+            return arg
+        # Bare name: one dict lookup (missing names stay False, matching
+        # the NameError behavior of the eval path)
+        return context.get(arg, False)
     try:
-        parsed = ast.parse(expr, mode='eval')
-
-        # Allow only safe built-ins
-        safe_builtins = {
-            "len": len,
-            "min": min,
-            "max": max,
-            "sum": sum,
-            "abs": abs,
-            "str": str,
-            "int": int,
-            "float": float,
-            "bool": bool,
-        }
-
-        # Create safe environment with context variables
-        safe_globals = {"__builtins__": safe_builtins}
-        
-        # Add all context variables directly (for bare variable access)
-        safe_globals.update(context)
-        
-        # Add 'rec' binding for explicit record access
-        safe_globals["rec"] = context
-        
-        # Add 'get' helper function for safe key access
-        safe_globals["get"] = lambda key, default=None: context.get(key, default)
-
-        return eval(compile(parsed, '<string>', 'eval'), safe_globals)
+        code = compile_expr(expr)
     except Exception:
-        # Return False for any evaluation errors (used in select operations)
         return False
+    return safe_eval_code(code, context)
+
+@lru_cache(maxsize=512)
+def _split_path(path: str) -> tuple:
+    """
+    Split a dotted path once; identical paths recur across records
+
+    Components are interned: JSON/YAML parsers intern dict keys too, so
+    the per-record lookups usually resolve on a pointer compare instead
+    of a character-wise string comparison.
+    """
+    return tuple(sys.intern(part) for part in path.split('.'))
 
 def deep_get(obj: Dict[str, Any], path: str, default=None) -> Any:
     """
     Get nested values using dot notation like 'user.profile.name'
     """
+    # EAFP: the happy path is plain subscripting with no isinstance checks
+    # or lambda calls per level; any miss (absent key, non-container
+    # intermediate) lands in the except and returns the default
+    current = obj
     try:
-        current = obj
-        for part in path.split('.'):
-            if isinstance(current, dict):
-                current = current[part]
-            else:
-                return default
+        for part in _split_path(path):
+            current = current[part]
         return current
-    except (KeyError, TypeError):
+    except (KeyError, TypeError, IndexError):
         return default
 
 def deep_set(obj: Dict[str, Any], path: str, value: Any) -> None:
     """
     Set nested values using dot notation
     """
-    parts = path.split('.')
+    parts = _split_path(path)
     current = obj
-    
+
     for part in parts[:-1]:
-        if part not in current:
-            current[part] = {}
-        current = current[part]
-    
+        # One get instead of a contains-check plus a getitem; non-dict
+        # intermediates are replaced so the remaining path can be set
+        nxt = current.get(part)
+        if not isinstance(nxt, dict):
+            nxt = {}
+            current[part] = nxt
+        current = nxt
+
     current[parts[-1]] = value
 
+def to_columns(records: List[Dict[str, Any]]) -> Dict[str, list]:
+    """
+    Convert a homogeneous record batch to columnar (SoA) layout
+
+    One list per key instead of one dict per record: a single allocation
+    per column and much better locality for batch-wise evaluation.
+    Assumes the batch shares a schema (see columnar.records_share_schema).
+    """
+    if not records:
+        return {}
+    return {key: [record[key] for record in records]
+            for key in records[0].keys()}
+
+def from_columns(cols: Dict[str, list], mask: List[bool] = None) -> List[Dict[str, Any]]:
+    """
+    Reconstruct record dicts from columnar layout
+
+    Args:
+        cols: Mapping of field name to value list (equal lengths)
+        mask: Optional boolean filter; only truthy rows are materialized
+    """
+    if not cols:
+        return []
+    keys = tuple(cols.keys())
+    rows = zip(*cols.values())
+    if mask is None:
+        return [dict(zip(keys, values)) for values in rows]
+    return [dict(zip(keys, values))
+            for values, keep in zip(rows, mask) if keep]
+
 def is_list_of_dicts(data: Any) -> bool:
     """Check if data is a list containing only dictionaries"""
-    return isinstance(data, list) and all(isinstance(item, dict) for item in data)
+    # Exact-type identity checks skip the MRO walk isinstance pays; the
+    # data here is parsed JSON/YAML, which never subclasses list/dict
+    return type(data) is list and all(type(item) is dict for item in data)
 
 def normalize_to_records(data: Any) -> List[Dict[str, Any]]:
     """
-    Normalize input to list of records for processing
-    NOTE: This duplicates functionality from io.py but is kept for backward compatibility
+    Normalize a document to a list of record dictionaries for processing
+
+    Canonical implementation — io.py and pipes.py re-export this one.
+
+    Args:
+        data: Document (dict, list of dicts, or other)
+
+    Returns:
+        List of record dictionaries
     """
     if isinstance(data, dict):
         return [data]
-    elif is_list_of_dicts(data):
+    elif isinstance(data, list):
+        # Scan until the first non-dict: homogeneous streams (the
+        # overwhelming case) return as-is without building a new list,
+        # and only a mixed tail pays for the per-item wrap
+        for index, item in enumerate(data):
+            if not isinstance(item, dict):
+                wrapped = data[:index]
+                wrapped.extend({"value": item} if not isinstance(item, dict)
+                               else item for item in data[index:])
+                return wrapped
         return data
     else:
-        # Wrap non-dict data as a record
+        # Wrap primitive values
         return [{"value": data}]
 
 # Test function for validation
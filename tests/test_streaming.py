@@ -0,0 +1,135 @@
+"""
+Tests for streaming I/O, NDJSON emit, and columnar/per-record equivalence
+"""
+
+import io
+import json
+import os
+import tempfile
+
+from jaql.io import output_result, write_json_stream, looks_like_ndjson
+from jaql.pipes import apply_pipeline
+from jaql.runner import run_pipeline
+
+def _write_tmp(content, suffix):
+    with tempfile.NamedTemporaryFile(mode='w', suffix=suffix, delete=False) as f:
+        f.write(content)
+        return f.name
+
+def test_ndjson_emit():
+    """--emit ndjson writes one compact JSON document per line"""
+    out = io.StringIO()
+    output_result([{"a": 1}, {"b": 2}], "ndjson", out)
+
+    lines = out.getvalue().splitlines()
+    assert len(lines) == 2
+    assert json.loads(lines[0]) == {"a": 1}
+    assert json.loads(lines[1]) == {"b": 2}
+
+def test_write_json_stream_formatting():
+    """Streamed JSON arrays keep the indent=2 array layout"""
+    records = [{"a": 1}, {"b": [1, 2]}]
+    out = io.StringIO()
+    write_json_stream(iter(records), out)
+
+    text = out.getvalue()
+    assert json.loads(text) == records
+    assert text.startswith('[\n  {')
+    assert text.endswith('\n]\n')
+
+    # Empty input still produces a valid (empty) array
+    out = io.StringIO()
+    write_json_stream(iter([]), out)
+    assert out.getvalue() == '[]\n'
+
+def test_streaming_ndjson_input():
+    """NDJSON input takes the record-at-a-time runner path"""
+    pipeline_yaml = """
+pipes:
+  - select: "cpu_percent > 5.0"
+  - project: ["user", "cpu_percent"]
+"""
+    ndjson = "".join(json.dumps(record) + "\n" for record in [
+        {"user": "root", "command": "init", "cpu_percent": 10.0},
+        {"user": "web", "command": "nginx", "cpu_percent": 1.0},
+        {"user": "db", "command": "postgres", "cpu_percent": 7.5},
+    ])
+    assert looks_like_ndjson(ndjson.encode())
+
+    pipeline_path = _write_tmp(pipeline_yaml, '.yaml')
+    input_path = _write_tmp(ndjson, '.ndjson')
+    output_path = input_path + '.out'
+    try:
+        run_pipeline(pipeline_path, input_path, output_path, "json")
+        with open(output_path) as f:
+            result = json.load(f)
+        assert result == [
+            {"user": "root", "cpu_percent": 10.0},
+            {"user": "db", "cpu_percent": 7.5},
+        ]
+
+        # Same input, NDJSON out: one line per surviving record
+        run_pipeline(pipeline_path, input_path, output_path, "ndjson")
+        with open(output_path) as f:
+            lines = [json.loads(line) for line in f if line.strip()]
+        assert lines == result
+    finally:
+        for path in (pipeline_path, input_path, output_path):
+            if os.path.exists(path):
+                os.unlink(path)
+
+def test_json_emit_accepts_yaml_only_values():
+    """Int mapping keys and >64-bit ints survive json/ndjson emit"""
+    pipeline_yaml = """
+pipes:
+  - derive: {"tag": "1"}
+"""
+    yaml_input = "- 1: x\n  big: 123456789012345678901234567890\n"
+    expected = [{"1": "x", "big": 123456789012345678901234567890, "tag": 1}]
+
+    pipeline_path = _write_tmp(pipeline_yaml, '.yaml')
+    input_path = _write_tmp(yaml_input, '.yaml')
+    output_path = input_path + '.out'
+    try:
+        run_pipeline(pipeline_path, input_path, output_path, "json")
+        with open(output_path) as f:
+            assert json.load(f) == expected
+
+        run_pipeline(pipeline_path, input_path, output_path, "ndjson")
+        with open(output_path) as f:
+            assert [json.loads(line) for line in f if line.strip()] == expected
+    finally:
+        for path in (pipeline_path, input_path, output_path):
+            if os.path.exists(path):
+                os.unlink(path)
+
+def test_columnar_matches_per_record():
+    """Large batches must produce exactly the per-record results"""
+    records = [{"x": i, "y": i % 7} for i in range(1500)]
+    pipeline = [
+        {"select": "x >= 400"},
+        # 'b' references a field derived in the same block, which the
+        # per-record path evaluates against the pre-derive record (False)
+        {"derive": {"a": "x * 2", "b": "a + 1"}},
+    ]
+
+    # Sub-threshold chunks stay on the per-record path; their
+    # concatenation is the reference result
+    expected = []
+    for start in range(0, len(records), 100):
+        chunk = [dict(record) for record in records[start:start + 100]]
+        expected.extend(apply_pipeline(chunk, pipeline))
+
+    result = apply_pipeline([dict(record) for record in records], pipeline)
+    assert result == expected
+
+def test_columnar_preserves_value_types():
+    """The fast path must not coerce mixed int/float columns"""
+    records = [{"x": float(i) if i % 2 else i} for i in range(1500)]
+
+    result = apply_pipeline([dict(record) for record in records],
+                            [{"derive": {"y": "x + 1"}}])
+    assert len(result) == len(records)
+    for got, source in zip(result, records):
+        assert got["x"] == source["x"]
+        assert type(got["x"]) is type(source["x"])